@@ -2,19 +2,33 @@
 Логика работы с файловой системой с поддержкой кириллицы
 """
 import os
+import hashlib
 import logging
-import shutil
 import re
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from file_system import FileSystem, LocalFileSystem
 
 
 class FileManager:
     """Управление файловыми операциями с поддержкой кириллицы"""
     
-    def __init__(self):
+    # Размер буфера потокового копирования и имя файла контрольных сумм
+    COPY_BUFFER_SIZE = 1024 * 1024
+    CHECKSUM_MANIFEST_NAME = "checksums.sha256"
+    
+    # Состояния строки предпросмотра
+    PREVIEW_RENAMED = "renamed"
+    PREVIEW_UNCHANGED = "unchanged"
+    PREVIEW_COLLISION = "collision"
+    PREVIEW_SKIPPED = "skipped"
+    
+    def __init__(self, file_system: Optional[FileSystem] = None):
         self.selected_files: List[Tuple[Path, str]] = []
+        self.fs = file_system or LocalFileSystem()
         self.logger = self._setup_logging()
+        self._copy_buffer = bytearray(self.COPY_BUFFER_SIZE)
     
     def _setup_logging(self):
         logger = logging.getLogger(__name__)
@@ -23,13 +37,15 @@ class FileManager:
     
     def add_files(self, file_paths: List[str]) -> int:
         added_count = 0
+        known_paths = {full_path for full_path, _ in self.selected_files}
         for file_path in file_paths:
             try:
                 file_path_obj = Path(file_path)
-                if file_path_obj.exists() and file_path_obj.is_file():
-                    if not any(full_path == file_path_obj for full_path, _ in self.selected_files):
+                if self.fs.exists(file_path_obj) and self.fs.is_file(file_path_obj):
+                    if file_path_obj not in known_paths:
                         display_name = file_path_obj.name
                         self.selected_files.append((file_path_obj, display_name))
+                        known_paths.add(file_path_obj)
                         added_count += 1
             except Exception as e:
                 self.logger.error(f"Ошибка добавления файла: {e}")
@@ -60,16 +76,24 @@ class FileManager:
             return True
         return False
     
-    def rename_files(self, start_number: int, output_dir: Optional[Path] = None) -> Tuple[bool, int]:
+    def rename_files(self, start_number: int, output_dir: Optional[Path] = None,
+                     verify: bool = False) -> Tuple[bool, int]:
         if not self.selected_files:
             return False, 0
         
         success_count = 0
+        unchanged_count = 0
         current_number = start_number
+        checksums: List[Tuple[str, str]] = []
+        processed_count = 0
+        success = True
         
         try:
-            for file_path, original_name in self.selected_files:
-                if file_path.exists():
+            # Наличие файлов фиксируется до начала, чтобы файл, занявший путь
+            # отсутствующего файла ниже по списку, не переименовывался дважды
+            existing = [self.fs.exists(file_path) for file_path, _ in self.selected_files]
+            for (file_path, original_name), exists in zip(self.selected_files, existing):
+                if exists:
                     # Получаем чистое имя файла без существующей нумерации
                     clean_filename = self._remove_existing_numbering(file_path.name)
                     
@@ -77,27 +101,222 @@ class FileManager:
                     new_filename = f"{current_number}. {clean_filename}"
                     
                     if output_dir:
-                        output_dir.mkdir(parents=True, exist_ok=True)
+                        self.fs.mkdir(output_dir)
                         new_path = self._get_unique_filename(output_dir / new_filename)
-                        shutil.copy2(file_path, new_path)
-                    else:
+                        digest = self._copy_with_checksum(file_path, new_path, verify)
+                        checksums.append((digest, new_path.name))
+                    elif file_path.name != new_filename:
                         new_path = self._get_unique_filename(file_path.parent / new_filename)
-                        file_path.rename(new_path)
+                        self.fs.rename(file_path, new_path)
+                    else:
+                        # Файл уже назван нужным образом, но номер за ним сохраняется
+                        unchanged_count += 1
+                        current_number += 1
+                        self.logger.info(f"Файл уже имеет нужное имя: {original_name}")
+                        processed_count += 1
+                        continue
                     
                     success_count += 1
                     current_number += 1
                     self.logger.info(f"Файл переименован: {original_name} -> {new_filename}")
-                    
-            if success_count > 0:
-                self.clear_files()
-                
-            return True, success_count
+                processed_count += 1
             
         except Exception as e:
             self.logger.error(f"Ошибка переименования: {e}")
-            return False, success_count
+            success = False
+        
+        # Суммы уже сделанных копий сохраняются, даже если операция прервана
+        if output_dir and checksums:
+            try:
+                self._write_checksum_manifest(output_dir, checksums)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Ошибка записи контрольных сумм: {e}")
+                success = False
+        
+        # Обработанные файлы убираются из списка, чтобы повтор не создал дубликаты
+        if success and success_count + unchanged_count > 0:
+            self.clear_files()
+        elif not success:
+            del self.selected_files[:processed_count]
+        
+        return success, success_count
+    
+    def _copy_with_checksum(self, source: Path, destination: Path, verify: bool = False) -> str:
+        """
+        Копирует файл, одновременно вычисляя его SHA-256.
+        
+        Данные читаются один раз через переиспользуемый буфер, поэтому
+        для подтверждения целостности не нужно повторно читать исходник.
+        Метаданные копируются так же, как в shutil.copy2. При любой ошибке
+        (включая несовпадение суммы при проверке) копия удаляется.
+        
+        Args:
+            source: Исходный файл
+            destination: Путь копии
+            verify: Сбросить копию на диск и сверить её хеш с хешем исходника
+        
+        Returns:
+            str: SHA-256 исходного файла в шестнадцатеричном виде
+        """
+        hasher = hashlib.sha256()
+        view = memoryview(self._copy_buffer)
+        try:
+            with self.fs.open(source, 'rb') as src, self.fs.open(destination, 'wb') as dst:
+                while True:
+                    read = src.readinto(self._copy_buffer)
+                    if not read:
+                        break
+                    hasher.update(view[:read])
+                    dst.write(view[:read])
+                if verify:
+                    self.fs.sync(dst)
+            self.fs.copystat(source, destination)
+            
+            digest = hasher.hexdigest()
+            if verify and not self._verify_copy(destination, digest):
+                raise IOError(f"Контрольная сумма копии не совпадает: {destination.name}")
+            return digest
+        
+        except Exception:
+            if self.fs.exists(destination):
+                self.fs.unlink(destination)
+            raise
+    
+    def _verify_copy(self, destination: Path, expected_digest: str) -> bool:
+        """
+        Проверяет копию, сравнивая её хеш с хешем, полученным при копировании.
+        
+        Args:
+            destination: Путь к скопированному и сброшенному на диск файлу
+            expected_digest: SHA-256 исходника из _copy_with_checksum
+            
+        Returns:
+            bool: True если содержимое копии совпадает с исходником
+        """
+        hasher = hashlib.sha256()
+        view = memoryview(self._copy_buffer)
+        with self.fs.open(destination, 'rb') as dst:
+            while True:
+                read = dst.readinto(self._copy_buffer)
+                if not read:
+                    break
+                hasher.update(view[:read])
+        return hasher.hexdigest() == expected_digest
     
-    def _remove_existing_numbering(self, filename: str) -> str:
+    def _write_checksum_manifest(self, output_dir: Path, checksums: List[Tuple[str, str]]):
+        """
+        Обновляет манифест контрольных сумм в формате sha256sum.
+        
+        Записи объединяются по имени файла: новая сумма заменяет старую,
+        а записи о файлах, которых больше нет в папке, удаляются.
+        Чужой файл с тем же именем не перезаписывается: манифест
+        сохраняется под следующим свободным именем (checksums_1.sha256).
+        Ошибки записи пробрасываются вызывающему коду.
+        """
+        manifest_path, entries = self._find_checksum_manifest(output_dir)
+        entries = {
+            filename: digest for filename, digest in entries.items()
+            if self.fs.exists(output_dir / filename)
+        }
+        
+        for digest, filename in checksums:
+            entries[filename] = digest
+        
+        with self.fs.open(manifest_path, 'wb') as manifest:
+            for filename, digest in entries.items():
+                manifest.write(f"{digest}  {filename}\n".encode('utf-8'))
+        self.logger.info(f"Контрольные суммы записаны: {manifest_path}")
+    
+    def _find_checksum_manifest(self, output_dir: Path) -> Tuple[Path, Dict[str, str]]:
+        """
+        Находит манифест, записанный этим приложением, или свободное имя для него.
+        
+        Returns:
+            Tuple[Path, Dict[str, str]]: Путь манифеста и его записи (имя -> сумма)
+        """
+        base_path = output_dir / self.CHECKSUM_MANIFEST_NAME
+        counter = 0
+        while True:
+            if counter == 0:
+                manifest_path = base_path
+            else:
+                manifest_path = output_dir / f"{base_path.stem}_{counter}{base_path.suffix}"
+            if not self.fs.exists(manifest_path):
+                return manifest_path, {}
+            entries = self._read_checksum_manifest(manifest_path)
+            if entries is not None:
+                return manifest_path, entries
+            counter += 1
+    
+    def _read_checksum_manifest(self, manifest_path: Path) -> Optional[Dict[str, str]]:
+        """
+        Читает манифест, если каждая его строка имеет вид, который пишет это приложение.
+        
+        Returns:
+            Optional[Dict[str, str]]: Записи манифеста или None для чужого файла
+        """
+        if not self.fs.is_file(manifest_path):
+            return None
+        
+        entries: Dict[str, str] = {}
+        with self.fs.open(manifest_path, 'rb') as manifest:
+            data = manifest.read()
+        for line in data.splitlines():
+            if not line:
+                continue
+            match = re.match(rb'^([0-9a-f]{64})  ([^*\\].*)$', line)
+            if not match:
+                return None
+            try:
+                filename = match.group(2).decode('utf-8')
+            except UnicodeDecodeError:
+                return None
+            entries[filename] = match.group(1).decode('ascii')
+        return entries
+    
+    def get_preview(self, index: int, number: int, output_dir: Optional[Path] = None,
+                    is_freed: Optional[Callable[[Path], bool]] = None) -> Tuple[str, str]:
+        """
+        Вычисляет итоговое имя одного файла без изменения файловой системы.
+        
+        Имя и разрешение коллизий повторяют rename_files, поэтому
+        предпросмотр можно считать лениво, только для видимых строк.
+        
+        Args:
+            index: Позиция файла в списке
+            number: Номер файла; отсутствующие файлы выше по списку
+                номер не занимают (см. rename_files)
+            output_dir: Папка вывода или None для переименования на месте
+            is_freed: Возвращает True для путей, которые к моменту
+                обработки файла освободят предыдущие переименования
+            
+        Returns:
+            Tuple[str, str]: Итоговое имя и состояние строки (PREVIEW_*)
+        """
+        file_path, _ = self.selected_files[index]
+        if not self.fs.exists(file_path):
+            return file_path.name, self.PREVIEW_SKIPPED
+        
+        new_filename = self.get_new_filename(index, number)
+        if output_dir is None and new_filename == file_path.name:
+            return new_filename, self.PREVIEW_UNCHANGED
+        
+        def is_occupied(path: Path) -> bool:
+            return self.fs.exists(path) and not (is_freed and is_freed(path))
+        
+        target_path = (output_dir or file_path.parent) / new_filename
+        new_path = self._get_unique_filename(target_path, is_occupied)
+        if new_path != target_path:
+            return new_path.name, self.PREVIEW_COLLISION
+        return new_path.name, self.PREVIEW_RENAMED
+    
+    def get_new_filename(self, index: int, number: int) -> str:
+        """Новое имя файла с номером до разрешения коллизий"""
+        file_path, _ = self.selected_files[index]
+        clean_filename = self._remove_existing_numbering(file_path.name, log=False)
+        return f"{number}. {clean_filename}"
+    
+    def _remove_existing_numbering(self, filename: str, log: bool = True) -> str:
         """
         Удаляет существующую нумерацию из имени файла.
         
@@ -129,17 +348,24 @@ class FileManager:
             match = re.match(pattern, filename)
             if match:
                 clean_name = match.group(1)
-                self.logger.info(f"Обнаружена нумерация в файле '{filename}' -> '{clean_name}'")
+                if log:
+                    self.logger.info(f"Обнаружена нумерация в файле '{filename}' -> '{clean_name}'")
                 return clean_name
         
         # Если нумерация не обнаружена, возвращаем оригинальное имя
         return filename
     
-    def _get_unique_filename(self, file_path: Path) -> Path:
+    def _get_unique_filename(self, file_path: Path,
+                             exists: Optional[Callable[[Path], bool]] = None) -> Path:
         """
         Генерирует уникальное имя файла, если файл с таким именем уже существует.
+        
+        Args:
+            file_path: Желаемый путь
+            exists: Проверка занятости пути, по умолчанию self.fs.exists
         """
-        if not file_path.exists():
+        exists = exists or self.fs.exists
+        if not exists(file_path):
             return file_path
         
         counter = 1
@@ -150,7 +376,7 @@ class FileManager:
         while True:
             new_filename = f"{original_stem}_{counter}{extension}"
             new_path = parent_dir / new_filename
-            if not new_path.exists():
+            if not exists(new_path):
                 return new_path
             counter += 1
     
@@ -197,6 +423,9 @@ class FileManager:
     def get_display_names(self) -> List[str]:
         return [display_name for _, display_name in self.selected_files]
     
+    def get_display_name(self, index: int) -> str:
+        return self.selected_files[index][1]
+    
     def get_numbered_files_info(self) -> List[str]:
         """
         Возвращает информацию о файлах с существующей нумерацией.
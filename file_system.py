@@ -0,0 +1,267 @@
+"""
+Абстракция файловой системы для менеджера файлов
+"""
+import io
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Set
+
+
+class FileSystem(ABC):
+    """Базовый интерфейс файловых операций, используемых FileManager"""
+
+    @abstractmethod
+    def exists(self, path: Path) -> bool:
+        pass
+
+    @abstractmethod
+    def is_file(self, path: Path) -> bool:
+        pass
+
+    @abstractmethod
+    def mkdir(self, path: Path):
+        """Создает директорию вместе с родительскими, если её ещё нет"""
+
+    @abstractmethod
+    def rename(self, source: Path, destination: Path):
+        pass
+
+    @abstractmethod
+    def unlink(self, path: Path):
+        pass
+
+    @abstractmethod
+    def open(self, path: Path, mode: str = 'rb') -> io.BufferedIOBase:
+        """Открывает файл в двоичном режиме: 'rb', 'wb' или 'ab'"""
+
+    @abstractmethod
+    def copystat(self, source: Path, destination: Path):
+        """Переносит метаданные (время изменения, права) с исходника на копию"""
+
+    @abstractmethod
+    def sync(self, file: io.BufferedIOBase):
+        """Сбрасывает открытый на запись файл на носитель"""
+
+
+class LocalFileSystem(FileSystem):
+    """Файловая система операционной системы"""
+
+    def exists(self, path: Path) -> bool:
+        return path.exists()
+
+    def is_file(self, path: Path) -> bool:
+        return path.is_file()
+
+    def mkdir(self, path: Path):
+        path.mkdir(parents=True, exist_ok=True)
+
+    def rename(self, source: Path, destination: Path):
+        source.rename(destination)
+
+    def unlink(self, path: Path):
+        path.unlink()
+
+    def open(self, path: Path, mode: str = 'rb') -> io.BufferedIOBase:
+        return open(path, mode)
+
+    def copystat(self, source: Path, destination: Path):
+        shutil.copystat(source, destination)
+
+    def sync(self, file: io.BufferedIOBase):
+        file.flush()
+        os.fsync(file.fileno())
+        # Убираем страницы из кэша, чтобы проверка читала данные с носителя
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+class _MemoryFile(io.BytesIO):
+    """Файл в памяти, сохраняющий содержимое в хранилище при закрытии"""
+
+    def __init__(self, storage: Dict[Path, bytes], path: Path, initial: bytes = b''):
+        super().__init__(initial)
+        self._storage = storage
+        self._path = path
+        self.seek(0, io.SEEK_END)
+
+    def close(self):
+        if not self.closed:
+            self._storage[self._path] = self.getvalue()
+        super().close()
+
+
+class InMemoryFileSystem(FileSystem):
+    """
+    Файловая система в памяти.
+
+    Позволяет проверять планирование имён и разрешение коллизий
+    на миллионах файлов без обращения к диску.
+    """
+
+    def __init__(self):
+        self.files: Dict[Path, bytes] = {}
+        self.directories: Set[Path] = set()
+        self.stats: Dict[Path, float] = {}
+
+    def add_file(self, path: Path, data: bytes = b'', mtime: float = 0.0):
+        """Создает файл вместе с родительскими директориями"""
+        path = Path(path)
+        self.mkdir(path.parent)
+        self.files[path] = bytes(data)
+        self.stats[path] = mtime
+
+    def exists(self, path: Path) -> bool:
+        return path in self.files or path in self.directories
+
+    def is_file(self, path: Path) -> bool:
+        return path in self.files
+
+    def mkdir(self, path: Path):
+        if path in self.files:
+            raise FileExistsError(str(path))
+        for ancestor in path.parents:
+            if ancestor in self.files:
+                raise NotADirectoryError(str(ancestor))
+        for directory in (path, *path.parents):
+            self.directories.add(directory)
+
+    def rename(self, source: Path, destination: Path):
+        if source not in self.files:
+            raise FileNotFoundError(str(source))
+        self._check_parent(destination)
+        self.files[destination] = self.files.pop(source)
+        self.stats[destination] = self.stats.pop(source, 0.0)
+
+    def unlink(self, path: Path):
+        if path not in self.files:
+            raise FileNotFoundError(str(path))
+        del self.files[path]
+        self.stats.pop(path, None)
+
+    def open(self, path: Path, mode: str = 'rb') -> io.BufferedIOBase:
+        if mode == 'rb':
+            if path not in self.files:
+                raise FileNotFoundError(str(path))
+            return io.BytesIO(self.files[path])
+        if mode in ('wb', 'ab'):
+            self._check_parent(path)
+            initial = self.files.get(path, b'') if mode == 'ab' else b''
+            self.files[path] = initial
+            self.stats.setdefault(path, 0.0)
+            return _MemoryFile(self.files, path, initial)
+        raise ValueError(f"Неподдерживаемый режим: {mode}")
+
+    def copystat(self, source: Path, destination: Path):
+        for path in (source, destination):
+            if path not in self.files:
+                raise FileNotFoundError(str(path))
+        self.stats[destination] = self.stats.get(source, 0.0)
+
+    def sync(self, file: io.BufferedIOBase):
+        pass
+
+    def _check_parent(self, path: Path):
+        if path.parent not in self.directories:
+            raise FileNotFoundError(str(path.parent))
+
+
+class _LatencyFile:
+    """
+    Обертка открытого файла, добавляющая задержку к чтению и записи.
+
+    Задержка пропорциональна числу блоков по block_size байт,
+    как у сетевого хранилища, которое передает данные блоками.
+    """
+
+    def __init__(self, file_system: 'LatencyFileSystem', file: io.BufferedIOBase):
+        self._file_system = file_system
+        self.raw_file = file
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw_file.read(size)
+        self._file_system._delay_bytes(len(data))
+        return data
+
+    def readinto(self, buffer) -> int:
+        read = self.raw_file.readinto(buffer)
+        self._file_system._delay_bytes(read or 0)
+        return read
+
+    def write(self, data) -> int:
+        self._file_system._delay_bytes(len(data))
+        return self.raw_file.write(data)
+
+    def close(self):
+        if not self.raw_file.closed:
+            self._file_system._delay()
+        self.raw_file.close()
+
+    def __getattr__(self, name):
+        return getattr(self.raw_file, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LatencyFileSystem(FileSystem):
+    """
+    Обертка, добавляющая задержку к каждой операции.
+
+    Имитирует медленные сетевые хранилища (NFS/SMB) поверх любой
+    другой реализации FileSystem. Чтение и запись открытых файлов
+    задерживаются на latency за каждый блок по block_size байт.
+    """
+
+    def __init__(self, inner: FileSystem, latency: float, block_size: int = 64 * 1024,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.inner = inner
+        self.latency = latency
+        self.block_size = block_size
+        self.call_count = 0
+        self._sleep = sleep
+
+    def _delay(self, blocks: int = 1):
+        self.call_count += 1
+        if self.latency > 0:
+            self._sleep(self.latency * blocks)
+
+    def _delay_bytes(self, size: int):
+        self._delay(max(1, -(-size // self.block_size)))
+
+    def exists(self, path: Path) -> bool:
+        self._delay()
+        return self.inner.exists(path)
+
+    def is_file(self, path: Path) -> bool:
+        self._delay()
+        return self.inner.is_file(path)
+
+    def mkdir(self, path: Path):
+        self._delay()
+        self.inner.mkdir(path)
+
+    def rename(self, source: Path, destination: Path):
+        self._delay()
+        self.inner.rename(source, destination)
+
+    def unlink(self, path: Path):
+        self._delay()
+        self.inner.unlink(path)
+
+    def open(self, path: Path, mode: str = 'rb') -> io.BufferedIOBase:
+        self._delay()
+        return _LatencyFile(self, self.inner.open(path, mode))
+
+    def copystat(self, source: Path, destination: Path):
+        self._delay()
+        self.inner.copystat(source, destination)
+
+    def sync(self, file: io.BufferedIOBase):
+        self._delay()
+        self.inner.sync(file.raw_file if isinstance(file, _LatencyFile) else file)
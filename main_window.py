@@ -7,13 +7,14 @@ from typing import Optional
 
 from PyQt5.QtWidgets import (QMainWindow, QMessageBox, QFileDialog, 
                              QCheckBox, QHBoxLayout, QVBoxLayout, QWidget,
-                             QLabel)
+                             QLabel, QListView)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QCursor
 
 # Импортируем сгенерированный UI
 from design_ui import Ui_MainWindow
 from file_manager import FileManager
+from preview_model import RenamePreviewModel
 
 
 class MainWindow(QMainWindow):
@@ -55,6 +56,9 @@ class MainWindow(QMainWindow):
         # Добавляем информационную метку о нумерации
         self._add_numbering_info_label()
         
+        # Добавляем панель предпросмотра новых имён
+        self._add_preview_pane()
+        
         # Настраиваем курсоры
         self._setup_cursors()
     
@@ -72,8 +76,13 @@ class MainWindow(QMainWindow):
         self.output_button = QCheckBox("Выбрать папку для сохранения")
         self.output_button.setEnabled(False)
         
+        # Чекбокс для проверки копий по контрольной сумме
+        self.verify_checkbox = QCheckBox("Проверять копии")
+        self.verify_checkbox.setEnabled(False)
+        
         checkbox_layout.addWidget(self.output_checkbox)
         checkbox_layout.addWidget(self.output_button)
+        checkbox_layout.addWidget(self.verify_checkbox)
         checkbox_layout.addStretch()
         
         output_layout.addLayout(checkbox_layout)
@@ -82,7 +91,7 @@ class MainWindow(QMainWindow):
         # Добавляем в интерфейс
         try:
             output_container.setParent(self.ui.centralwidget)
-            output_container.setGeometry(50, 500, 400, 60)
+            output_container.setGeometry(50, 500, 560, 60)
         except Exception as e:
             logging.error(f"Ошибка при добавлении опций вывода: {e}")
     
@@ -93,6 +102,18 @@ class MainWindow(QMainWindow):
         self.numbering_info_label.setStyleSheet("color: blue; font-size: 12px;")
         self.numbering_info_label.setVisible(False)
     
+    def _add_preview_pane(self):
+        """Добавляет панель предпросмотра «старое имя → новое имя»"""
+        self.preview_label = QLabel("Предпросмотр:", self.ui.centralwidget)
+        self.preview_label.setGeometry(260, 270, 370, 25)
+        
+        self.preview_model = RenamePreviewModel(self.file_manager, self.ui.spinBox.value(), self)
+        self.preview_view = QListView(self.ui.centralwidget)
+        self.preview_view.setGeometry(260, 300, 370, 190)
+        # Одинаковая высота строк позволяет представлению запрашивать только видимые строки
+        self.preview_view.setUniformItemSizes(True)
+        self.preview_view.setModel(self.preview_model)
+    
     def _setup_cursors(self):
         """Настройка курсоров"""
         pointing_cursor = QCursor(Qt.PointingHandCursor)
@@ -119,13 +140,22 @@ class MainWindow(QMainWindow):
         # Опции вывода
         self.output_checkbox.toggled.connect(self._on_output_checkbox_toggled)
         self.output_button.clicked.connect(self._on_select_output_directory)
+        
+        # Предпросмотр
+        self.ui.spinBox.valueChanged.connect(self.preview_model.set_start_number)
     
     def _on_output_checkbox_toggled(self, checked):
         """Обработчик переключения чекбокса вывода"""
         self.output_button.setEnabled(checked)
+        self.verify_checkbox.setEnabled(checked)
         if not checked:
+            self.verify_checkbox.setChecked(False)
             self.output_directory = None
             self.output_button.setText("Выбрать папку для сохранения")
+        self.preview_model.set_output_dir(
+            self.output_directory if checked else None,
+            awaiting=checked and self.output_directory is None
+        )
     
     def _on_select_output_directory(self):
         """Обработчик выбора директории вывода"""
@@ -140,6 +170,7 @@ class MainWindow(QMainWindow):
             if len(display_path) > 40:
                 display_path = "..." + display_path[-37:]
             self.output_button.setText(f"Папка: {display_path}")
+            self.preview_model.set_output_dir(self.output_directory)
     
     def _on_select_files(self):
         """Обработчик выбора файлов"""
@@ -154,6 +185,7 @@ class MainWindow(QMainWindow):
             added_count = self.file_manager.add_files(files)
             if added_count > 0:
                 self._refresh_list_display()
+                self.preview_model.reset()
                 self._update_ui_state()
                 self._update_numbering_info()
                 self._show_info(f"Добавлено файлов: {added_count}")
@@ -178,6 +210,7 @@ class MainWindow(QMainWindow):
         """Обработчик очистки списка"""
         self.file_manager.clear_files()
         self.ui.list.clear()
+        self.preview_model.reset()
         self._update_ui_state()
         self.numbering_info_label.setVisible(False)
     
@@ -210,14 +243,22 @@ class MainWindow(QMainWindow):
             if reply != QMessageBox.Yes:
                 return
         
-        success, count = self.file_manager.rename_files(start_number, output_dir)
+        verify = self.verify_checkbox.isChecked()
+        success, count = self.file_manager.rename_files(start_number, output_dir, verify)
         
         if success:
             self._show_info(f"Успешно переименовано {count} файлов!")
             self.ui.list.clear()
+            self.preview_model.reset()
             self._update_ui_state()
             self.numbering_info_label.setVisible(False)
         else:
+            # Обработанные файлы убраны из списка, а часть файлов на диске
+            # уже изменена, поэтому список и предпросмотр перестраиваются
+            self._refresh_list_display()
+            self.preview_model.reset()
+            self._update_ui_state()
+            self._update_numbering_info()
             if count > 0:
                 self._show_warning(f"Частично выполнено! Обработано {count} файлов, но возникли ошибки")
             else:
@@ -228,6 +269,7 @@ class MainWindow(QMainWindow):
         current_row = self.ui.list.currentRow()
         if self.file_manager.move_file_up(current_row):
             self._refresh_list_display()
+            self.preview_model.swap_rows(current_row - 1)
             new_index = max(0, current_row - 1)
             self.ui.list.setCurrentRow(new_index)
     
@@ -236,13 +278,14 @@ class MainWindow(QMainWindow):
         current_row = self.ui.list.currentRow()
         if self.file_manager.move_file_down(current_row):
             self._refresh_list_display()
+            self.preview_model.swap_rows(current_row)
             new_index = min(self.ui.list.count() - 1, current_row + 1)
             self.ui.list.setCurrentRow(new_index)
     
     def _on_delete_selected(self):
         """Удаление выбранного файла"""
         current_row = self.ui.list.currentRow()
-        if self.file_manager.remove_file(current_row):
+        if self.preview_model.remove_row(current_row):
             self.ui.list.takeItem(current_row)
             self._update_ui_state()
             self._update_numbering_info()
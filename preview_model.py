@@ -0,0 +1,246 @@
+"""
+Модель ленивого предпросмотра новых имён файлов
+"""
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor
+
+from file_manager import FileManager
+
+
+class RenamePreviewModel(QAbstractListModel):
+    """
+    Предпросмотр переименования в виде "старое имя → новое имя".
+
+    Новые имена вычисляются только для строк, которые запрашивает
+    представление (видимых), и кэшируются до инвалидации. Результат
+    совпадает с rename_files: отсутствующие файлы пропускаются и не
+    занимают номер, а пути, которые освободят предыдущие переименования
+    той же партии, не считаются занятыми.
+
+    Номер строки зависит от наличия всех файлов выше, поэтому наличие
+    проверяется в фоновом потоке порциями. Пока порция со строкой не
+    пришла, строка показывается как заглушка.
+    """
+
+    COLLISION_BRUSH = QBrush(QColor(255, 200, 200))
+    UNCHANGED_BRUSH = QBrush(QColor(150, 150, 150))
+    SCAN_CHUNK_SIZE = 512
+
+    # Порция результатов фоновой проверки: поколение, первая строка, флаги наличия
+    _scan_chunk_ready = pyqtSignal(int, int, list)
+
+    def __init__(self, file_manager: FileManager, start_number: int, parent=None):
+        super().__init__(parent)
+        self.file_manager = file_manager
+        self.start_number = start_number
+        self.output_dir: Optional[Path] = None
+        self._cache: Dict[int, Tuple[str, str]] = {}
+        # Строки, от исходных путей которых зависит кэшированная строка
+        self._dependencies: Dict[int, Set[int]] = {}
+        # Наличие файлов и число пропущенных выше, заполняются фоновой проверкой
+        self._exists: List[bool] = []
+        self._skipped_before: List[int] = []
+        self._source_rows: Optional[Dict[Path, int]] = None
+        self._scan_generation = 0
+        self._awaiting_output_dir = False
+        self._scan_chunk_ready.connect(self._on_scan_chunk)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.file_manager.get_file_count()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if self._awaiting_output_dir or row >= len(self._exists):
+            return self._placeholder_data(row, role)
+
+        if role == Qt.DisplayRole:
+            new_name, status = self._get_preview(row)
+            old_name = self.file_manager.get_display_name(row)
+            if status == FileManager.PREVIEW_SKIPPED:
+                return f"{old_name} → файл не найден, будет пропущен"
+            return f"{old_name} → {new_name}"
+        if role == Qt.BackgroundRole:
+            _, status = self._get_preview(row)
+            if status == FileManager.PREVIEW_COLLISION:
+                return self.COLLISION_BRUSH
+        if role == Qt.ForegroundRole:
+            _, status = self._get_preview(row)
+            if status in (FileManager.PREVIEW_UNCHANGED, FileManager.PREVIEW_SKIPPED):
+                return self.UNCHANGED_BRUSH
+        return None
+
+    def _placeholder_data(self, row: int, role):
+        """Строка, для которой итоговое имя пока нельзя вычислить"""
+        if role == Qt.DisplayRole:
+            old_name = self.file_manager.get_display_name(row)
+            if self._awaiting_output_dir:
+                return f"{old_name} → выберите папку для сохранения"
+            return f"{old_name} → …"
+        if role == Qt.ForegroundRole:
+            return self.UNCHANGED_BRUSH
+        return None
+
+    def _get_preview(self, row: int) -> Tuple[str, str]:
+        """Возвращает имя и состояние строки, вычисляя их при первом запросе"""
+        if row not in self._cache:
+            dependencies: Set[int] = set()
+            is_freed = None
+            if self.output_dir is None:
+                is_freed = lambda path: self._is_freed(path, row, dependencies)
+            self._cache[row] = self.file_manager.get_preview(
+                row, self._number(row), self.output_dir, is_freed
+            )
+            self._dependencies[row] = dependencies
+        return self._cache[row]
+
+    def _number(self, row: int) -> int:
+        """Номер уже проверенной строки с учётом отсутствующих файлов выше"""
+        return self.start_number + row - self._skipped_before[row]
+
+    def _start_scan(self):
+        """Запускает фоновую проверку наличия файлов с первой непроверенной строки"""
+        self._scan_generation += 1
+        first = len(self._exists)
+        paths = [file_path for file_path, _ in self.file_manager.selected_files[first:]]
+        if paths:
+            thread = threading.Thread(
+                target=self._scan, args=(self._scan_generation, first, paths), daemon=True
+            )
+            thread.start()
+
+    def _scan(self, generation: int, first: int, paths: List[Path]):
+        """Выполняется в фоновом потоке; устаревшая проверка прерывается"""
+        fs = self.file_manager.fs
+        for offset in range(0, len(paths), self.SCAN_CHUNK_SIZE):
+            if generation != self._scan_generation:
+                return
+            chunk = paths[offset:offset + self.SCAN_CHUNK_SIZE]
+            self._scan_chunk_ready.emit(generation, first + offset, [fs.exists(p) for p in chunk])
+
+    def _on_scan_chunk(self, generation: int, first: int, flags: List[bool]):
+        """Принимает порцию результатов в потоке интерфейса"""
+        if generation != self._scan_generation or first != len(self._exists):
+            return
+        for exists in flags:
+            skipped = 0
+            if self._exists:
+                skipped = self._skipped_before[-1] + (not self._exists[-1])
+            self._skipped_before.append(skipped)
+            self._exists.append(exists)
+        self.dataChanged.emit(self.index(first), self.index(first + len(flags) - 1))
+
+    def _is_freed(self, path: Path, row: int, dependencies: Set[int]) -> bool:
+        """
+        Проверяет, освободит ли путь переименование одной из строк выше.
+
+        Строка освобождает свой исходный путь, если файл существует
+        и его новое имя отличается от текущего.
+        """
+        if self._source_rows is None:
+            self._source_rows = {
+                file_path: source_row
+                for source_row, (file_path, _) in enumerate(self.file_manager.selected_files)
+            }
+        source_row = self._source_rows.get(path)
+        if source_row is None or source_row >= row:
+            return False
+
+        dependencies.add(source_row)
+        if not self._exists[source_row]:
+            return False
+        number = self._number(source_row)
+        return self.file_manager.get_new_filename(source_row, number) != path.name
+
+    def set_start_number(self, start_number: int):
+        """Номер меняет все имена, но пересчитаны будут только видимые строки"""
+        if start_number != self.start_number:
+            self.start_number = start_number
+            self.invalidate_rows(0, self.rowCount() - 1)
+
+    def set_output_dir(self, output_dir: Optional[Path], awaiting: bool = False):
+        """
+        Задает папку вывода.
+
+        awaiting=True означает, что копирование выбрано, но папка ещё не выбрана:
+        до её выбора вместо имён показывается заглушка.
+        """
+        if output_dir != self.output_dir or awaiting != self._awaiting_output_dir:
+            self.output_dir = output_dir
+            self._awaiting_output_dir = awaiting
+            self.invalidate_rows(0, self.rowCount() - 1)
+
+    def invalidate_rows(self, first: int, last: int):
+        """
+        Сбрасывает кэш для диапазона строк и уведомляет представление.
+
+        Также сбрасываются строки ниже, чьё имя зависело от строк диапазона.
+        """
+        if first > last:
+            return
+        if first == 0 and last >= self.rowCount() - 1:
+            self._cache.clear()
+            self._dependencies.clear()
+            self.dataChanged.emit(self.index(first), self.index(last))
+            return
+
+        stale_rows = [
+            row for row, dependencies in self._dependencies.items()
+            if first <= row <= last or any(first <= d <= last for d in dependencies)
+        ]
+        for row in stale_rows:
+            self._cache.pop(row, None)
+            del self._dependencies[row]
+        self.dataChanged.emit(self.index(first), self.index(max([last] + stale_rows)))
+
+    def swap_rows(self, first: int):
+        """Обновляет модель после обмена строк first и first + 1 в FileManager"""
+        if first + 1 < len(self._exists):
+            self._exists[first], self._exists[first + 1] = self._exists[first + 1], self._exists[first]
+            self._skipped_before[first + 1] = self._skipped_before[first] + (not self._exists[first])
+            self._source_rows = None
+        else:
+            self._truncate(first)
+            self._start_scan()
+        self.invalidate_rows(first, first + 1)
+
+    def remove_row(self, row: int) -> bool:
+        """
+        Удаляет файл из FileManager и строку из модели.
+
+        Номера всех последующих строк сдвигаются, поэтому их кэш сбрасывается.
+        """
+        if not 0 <= row < self.rowCount():
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        removed = self.file_manager.remove_file(row)
+        self._truncate(row)
+        for cached_row in [r for r in self._cache if r >= row]:
+            del self._cache[cached_row]
+            del self._dependencies[cached_row]
+        self.endRemoveRows()
+        self._start_scan()
+        return removed
+
+    def reset(self):
+        """Полностью перестраивает модель после изменения списка или файлов на диске"""
+        self.beginResetModel()
+        self._cache.clear()
+        self._dependencies.clear()
+        self._truncate(0)
+        self.endResetModel()
+        self._start_scan()
+
+    def _truncate(self, row: int):
+        """Сбрасывает данные о наличии файлов начиная со строки row"""
+        del self._exists[row:]
+        del self._skipped_before[row:]
+        self._source_rows = None
@@ -0,0 +1,142 @@
+"""
+Тесты FileManager на файловой системе в памяти
+"""
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from file_manager import FileManager
+from file_system import InMemoryFileSystem
+
+
+def make_manager(names, directory='/src'):
+    fs = InMemoryFileSystem()
+    for name in names:
+        fs.add_file(Path(directory) / name, name.encode('utf-8'))
+    manager = FileManager(fs)
+    manager.add_files([f"{directory}/{name}" for name in names])
+    return manager, fs
+
+
+def test_rename_in_place_strips_numbering():
+    manager, fs = make_manager(['05_a.txt', 'б.txt'])
+
+    assert manager.rename_files(1) == (True, 2)
+    assert set(fs.files) == {Path('/src/1. a.txt'), Path('/src/2. б.txt')}
+    assert manager.get_file_count() == 0
+
+
+def test_rename_resolves_collisions_with_suffix():
+    manager, fs = make_manager(['a.txt'])
+    fs.add_file(Path('/src/1. a.txt'))
+    fs.add_file(Path('/src/1. a_1.txt'))
+
+    assert manager.rename_files(1) == (True, 1)
+    assert fs.files[Path('/src/1. a_2.txt')] == b'a.txt'
+
+
+def test_rename_skips_missing_files_without_using_a_number():
+    manager, fs = make_manager(['a.txt', 'b.txt', 'c.txt'])
+    fs.unlink(Path('/src/b.txt'))
+
+    assert manager.rename_files(1) == (True, 2)
+    assert Path('/src/2. c.txt') in fs.files
+
+
+def test_rename_at_scale():
+    names = [f"{i % 100}_file{i}.txt" for i in range(10000)]
+    manager, fs = make_manager(names)
+
+    assert manager.rename_files(1) == (True, 10000)
+    assert Path('/src/10000. file9999.txt') in fs.files
+
+
+def test_copy_writes_manifest_and_verifies():
+    manager, fs = make_manager(['a.txt', 'b.txt'])
+
+    assert manager.rename_files(1, Path('/out'), verify=True) == (True, 2)
+    manifest = fs.files[Path('/out/checksums.sha256')].decode('utf-8')
+    expected = ''.join(
+        f"{hashlib.sha256(fs.files[Path('/out') / name]).hexdigest()}  {name}\n"
+        for name in ('1. a.txt', '2. b.txt')
+    )
+    assert manifest == expected
+    assert Path('/src/a.txt') in fs.files
+
+
+def test_manifest_keeps_one_entry_per_name():
+    manager, fs = make_manager(['a.txt'])
+    manager.rename_files(1, Path('/out'))
+    fs.unlink(Path('/out/1. a.txt'))
+    fs.files[Path('/src/a.txt')] = b'changed'
+
+    manager.add_files(['/src/a.txt'])
+    manager.rename_files(1, Path('/out'))
+
+    manifest = fs.files[Path('/out/checksums.sha256')].decode('utf-8')
+    assert manifest == f"{hashlib.sha256(b'changed').hexdigest()}  1. a.txt\n"
+
+
+@pytest.mark.parametrize('foreign', [
+    'Привет'.encode('cp1251') + b'\n',
+    b'0' * 64 + b' *a.bin\n',
+    b'SHA256 (a.bin) = ' + b'0' * 64 + b'\n',
+])
+def test_foreign_manifest_is_left_intact(foreign):
+    manager, fs = make_manager(['a.txt'])
+    fs.add_file(Path('/out/checksums.sha256'), foreign)
+
+    assert manager.rename_files(1, Path('/out')) == (True, 1)
+    assert fs.files[Path('/out/checksums.sha256')] == foreign
+    assert fs.files[Path('/out/checksums_1.sha256')].endswith(b'  1. a.txt\n')
+
+
+def test_verify_mismatch_removes_copy():
+    manager, fs = make_manager(['a.txt', 'b.txt'])
+    manager._verify_copy = lambda destination, digest: False
+
+    assert manager.rename_files(1, Path('/out'), verify=True) == (False, 0)
+    assert not any(path.parent == Path('/out') and path.name != 'checksums.sha256'
+                   for path in fs.files)
+    assert manager.get_file_count() == 2
+
+
+def test_failed_copy_is_cleaned_up_and_copied_files_leave_selection(monkeypatch):
+    manager, fs = make_manager(['a.txt', 'b.txt'])
+    copystat = fs.copystat
+
+    def failing_copystat(source, destination):
+        if source.name == 'b.txt':
+            raise OSError('copystat failed')
+        copystat(source, destination)
+
+    monkeypatch.setattr(fs, 'copystat', failing_copystat)
+
+    assert manager.rename_files(1, Path('/out')) == (False, 1)
+    assert Path('/out/2. b.txt') not in fs.files
+    assert Path('/out/1. a.txt') in fs.files
+    assert manager.get_display_names() == ['b.txt']
+
+
+def test_manifest_failure_still_clears_copied_files(monkeypatch):
+    manager, fs = make_manager(['a.txt'])
+    open_file = fs.open
+
+    def failing_open(path, mode='rb'):
+        if path.name == 'checksums.sha256' and mode == 'wb':
+            raise OSError('disk full')
+        return open_file(path, mode)
+
+    monkeypatch.setattr(fs, 'open', failing_open)
+
+    assert manager.rename_files(1, Path('/out')) == (False, 1)
+    assert manager.get_file_count() == 0
+
+
+def test_already_named_file_is_not_counted_as_renamed():
+    manager, fs = make_manager(['1. a.txt', 'b.txt'])
+
+    assert manager.rename_files(1) == (True, 1)
+    assert set(fs.files) == {Path('/src/1. a.txt'), Path('/src/2. b.txt')}
+    assert manager.get_file_count() == 0
@@ -0,0 +1,68 @@
+"""
+Тесты реализаций FileSystem
+"""
+from pathlib import Path
+
+import pytest
+
+from file_manager import FileManager
+from file_system import FileSystem, InMemoryFileSystem, LatencyFileSystem
+
+
+def test_incomplete_backend_cannot_be_created():
+    class Incomplete(FileSystem):
+        def exists(self, path):
+            return False
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_in_memory_mkdir_rejects_file_ancestor():
+    fs = InMemoryFileSystem()
+    fs.add_file(Path('/a/file'))
+
+    with pytest.raises(NotADirectoryError):
+        fs.mkdir(Path('/a/file/sub'))
+    assert Path('/a/file/sub') not in fs.directories
+
+
+def test_in_memory_copystat_reports_missing_destination():
+    fs = InMemoryFileSystem()
+    fs.add_file(Path('/a/file'))
+
+    with pytest.raises(FileNotFoundError, match='missing'):
+        fs.copystat(Path('/a/file'), Path('/a/missing'))
+
+
+def test_latency_counts_metadata_calls():
+    sleeps = []
+    fs = LatencyFileSystem(InMemoryFileSystem(), 0.01, sleep=sleeps.append)
+
+    fs.mkdir(Path('/a'))
+    fs.exists(Path('/a'))
+
+    assert fs.call_count == 2
+    assert sleeps == [0.01, 0.01]
+
+
+def test_latency_scales_with_streamed_bytes():
+    inner = InMemoryFileSystem()
+    inner.add_file(Path('/src/big.bin'), b'x' * (10 * 1024 * 1024))
+    inner.add_file(Path('/src/empty.bin'))
+
+    def copy_delay(name):
+        sleeps = []
+        fs = LatencyFileSystem(inner, 0.01, block_size=64 * 1024, sleep=sleeps.append)
+        manager = FileManager(fs)
+        manager.add_files([f'/src/{name}'])
+        assert manager.rename_files(1, Path(f'/out-{name}'), verify=True)[0]
+        return fs.call_count, sum(sleeps)
+
+    big_calls, big_delay = copy_delay('big.bin')
+    empty_calls, empty_delay = copy_delay('empty.bin')
+
+    assert big_calls > empty_calls
+    # 10 МБ по 64 КБ: 160 блоков на чтение, запись и проверку
+    assert big_delay >= 0.01 * 160 * 3
+    assert empty_delay < 1